@@ -0,0 +1,102 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import engines
+import model_cache
+
+# عدد الصفوف في كل دفعة؛ يحدد سقف الذاكرة مهما كان حجم الملف
+CHUNK_ROWS = 50_000
+NUMERIC = [col for col in model_cache.FEATURES if col not in model_cache.CATEGORICAL]
+# أقصى عدد أرقام صفوف تُذكر في رسالة الخطأ
+MAX_REPORTED_ROWS = 5
+
+
+def _is_parquet(source):
+    name = source if isinstance(source, (str, Path)) else getattr(source, "name", "")
+    return str(name).lower().endswith((".parquet", ".pq"))
+
+
+def iter_chunks(source, chunk_rows=CHUNK_ROWS):
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+
+
+def check_columns(columns):
+    missing = [col for col in model_cache.FEATURES if col not in columns]
+    if missing:
+        raise ValueError(f"أعمدة ناقصة في الملف: {', '.join(missing)}")
+
+
+def clean_chunk(chunk, first_row=0):
+    # ✅ الميزانية والمدة يجب أن تكون أرقامًا محددة: الخلايا الفارغة أو النصية أو nan/inf تُرفض
+    # كما في الخادم، بدل أن تُقيَّم بصمت (والصفوف تُرقَّم من 1 بعد سطر العناوين)
+    numbers = chunk[NUMERIC].apply(pd.to_numeric, errors="coerce")
+    invalid = np.flatnonzero(~np.isfinite(numbers.to_numpy(dtype=np.float64)).all(axis=1))
+    if len(invalid):
+        rows = ", ".join(str(first_row + i + 1) for i in invalid[:MAX_REPORTED_ROWS])
+        more = " ..." if len(invalid) > MAX_REPORTED_ROWS else ""
+        raise ValueError(f"قيم غير صالحة في {' أو '.join(NUMERIC)} في {len(invalid)} صف (الصفوف: {rows}{more})")
+    out = chunk.copy()
+    out[NUMERIC] = numbers
+    return out
+
+
+def score_chunk(bundle, chunk):
+    model = bundle["model"]
+    proba = model_cache.predict_proba(bundle, model_cache.encode(bundle, chunk))
+    predicted = model.classes_[proba.argmax(axis=1)]
+
+    out = chunk.copy()
+    out["احتمال_النجاح"] = proba[:, list(model.classes_).index(1)]
+    out["التوقع"] = np.where(predicted == 1, "نجاح", "فشل")
+    return out
+
+
+def score_stream(bundle, source, out, chunk_rows=CHUNK_ROWS):
+    # 📌 كل دفعة تُقيَّم وتُكتب مباشرة ثم تُترك، فلا يُحمَّل الملف كاملًا في الذاكرة
+    # الأعمدة تُفحص مرة واحدة على أول دفعة قبل كتابة أي شيء، والقيم تُفحص في كل دفعة
+    rows = 0
+    for i, chunk in enumerate(iter_chunks(source, chunk_rows)):
+        if i == 0:
+            check_columns(chunk.columns)
+        score_chunk(bundle, clean_chunk(chunk, rows)).to_csv(out, header=(i == 0), index=False)
+        rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="تقييم دفعة من الحملات التسويقية من ملف CSV أو Parquet")
+    parser.add_argument("input", help="ملف الحملات بنفس أعمدة بيانات التدريب بدون عمود النجاح")
+    parser.add_argument("-o", "--output", help="ملف النتائج (الافتراضي: المخرج القياسي)")
+    parser.add_argument("--data", default=model_cache.DATA_PATH, help="بيانات التدريب")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--engine", choices=list(engines.ENGINES), default=model_cache.DEFAULT_PARAMS["engine"],
+                        help="محرك التدريب")
+    args = parser.parse_args(argv)
+
+    bundle = model_cache.load_or_train(args.data, {"engine": args.engine})
+    try:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8-sig", newline="") as out:
+                rows = score_stream(bundle, args.input, out, args.chunk_rows)
+        else:
+            rows = score_stream(bundle, args.input, sys.stdout, args.chunk_rows)
+    except ValueError as exc:
+        # لا يُترك ملف نتائج ناقص
+        if args.output:
+            Path(args.output).unlink(missing_ok=True)
+        sys.exit(f"❌ {exc}")
+    print(f"✅ تم تقييم {rows} حملة", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
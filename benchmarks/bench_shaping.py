@@ -0,0 +1,47 @@
+# ⏱️ قياس سرعة تشكيل النصوص العربية: استدعاء لكل صف مقابل استدعاء لكل فئة
+# التشغيل من جذر المستودع: python -m benchmarks.bench_shaping --rows 1000000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import arabic_reshaper
+from bidi.algorithm import get_display
+
+from shaping import shape, shape_series
+
+القنوات = ["إعلانات رقمية", "وسائل التواصل", "تلفزيون", "راديو", "بريد إلكتروني"]
+تسميات_النجاح = {0: "نجاح", 1: "فشل"}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(42)
+    القناة = pd.Series(rng.choice(القنوات, args.rows))
+    النجاح = pd.Series(rng.integers(0, 2, args.rows))
+
+    cases = [
+        ("القناة", lambda: القناة.apply(lambda x: get_display(arabic_reshaper.reshape(x))),
+         lambda: shape_series(القناة)),
+        ("النجاح", lambda: النجاح.map(تسميات_النجاح).apply(lambda x: get_display(arabic_reshaper.reshape(x))),
+         lambda: shape_series(النجاح, تسميات_النجاح)),
+    ]
+    for name, per_row, per_category in cases:
+        shape.cache_clear()
+        t_row, expected = timed(per_row)
+        t_cat, got = timed(per_category)
+        assert (got.astype(str) == expected).all()
+        print(f"{name}: {args.rows} صف | لكل صف {t_row:.3f} ث | لكل فئة {t_cat:.3f} ث | تسريع ×{t_row / t_cat:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# 🚀 قياس البدء البارد للتطبيق: زمن الاستيراد، زمن أول صفحة، وزمن أول تنبؤ، كل قياس في عملية جديدة
+# التشغيل من جذر المستودع: python -m benchmarks.cold_start --runs 3 --think 3
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP = Path(__file__).resolve().parent.parent / "décision.py"
+
+
+def app_imports():
+    # جمل الاستيراد في أعلى ملف التطبيق كما هي، فيبقى القياس صحيحًا مهما تغيرت
+    tree = ast.parse(APP.read_text(encoding="utf-8"))
+    return ast.unparse(ast.Module([node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))], []))
+
+
+def measure_imports():
+    code = app_imports()
+    start = time.perf_counter()
+    exec(code, {})
+    return {"import_s": time.perf_counter() - start}
+
+
+def measure_app(think):
+    # زمن أول صفحة يشمل استيراد streamlit؛ ثم انتظار "تفكير المستخدم" قبل الضغط على زر التحليل
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP), default_timeout=600)
+    at.run()
+    first_page = time.perf_counter() - start
+    time.sleep(think)
+    click = time.perf_counter()
+    at.button[0].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    done = time.perf_counter()
+    return {"first_page_s": first_page, "first_click_s": done - click,
+            "time_to_first_prediction_s": done - start - think}
+
+
+def worker(mode, think):
+    sys.path.insert(0, str(APP.parent))
+    os.chdir(APP.parent)
+    result = measure_imports() if mode == "imports" else measure_app(think)
+    print(json.dumps(result))
+
+
+def run_worker(mode, think, env):
+    cmd = [sys.executable, "-m", "benchmarks.cold_start", "--worker", mode, "--think", str(think)]
+    done = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=APP.parent, check=True)
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="قياس البدء البارد للتطبيق")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--think", type=float, default=3.0, help="ثوانٍ بين ظهور الصفحة والضغط على زر التحليل")
+    parser.add_argument("--empty-cache", action="store_true", help="بدون نماذج وبيانات مخزنة على القرص (تدريب كامل)")
+    parser.add_argument("--json", help="حفظ النتائج في ملف JSON")
+    parser.add_argument("--worker", choices=["imports", "app"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker, args.think)
+        return
+
+    samples = {}
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache:
+            env = dict(os.environ)
+            if args.empty_cache:
+                env.update(DECISION_CACHE_DIR=f"{cache}/models", DECISION_DATA_CACHE_DIR=f"{cache}/data")
+            for mode in ("imports", "app"):
+                for key, value in run_worker(mode, args.think, env).items():
+                    samples.setdefault(key, []).append(value)
+
+    results = {key: round(statistics.median(values), 3) for key, values in samples.items()}
+    print(" | ".join(f"{key} {value:.3f}" for key, value in results.items()))
+    if args.json:
+        Path(args.json).write_text(json.dumps({"runs": args.runs, "think_s": args.think, "empty_cache": args.empty_cache,
+                                               "median": results, "samples": samples}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# ⚖️ مقارنة محركات التدريب: زمن التدريب، أقصى استهلاك للذاكرة، ودقة بيانات الاختبار حسب حجم البيانات
+# التشغيل من جذر المستودع: python -m benchmarks.compare_engines --engines hgb --sizes 1000000
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import engines
+import model_cache
+from benchmarks import synthetic
+
+
+def peak_rss_mb():
+    # ru_maxrss بالكيلوبايت على لينكس
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_one(engine, rows, n_jobs, success_rate):
+    # 📌 يعمل في عملية مستقلة حتى يكون أقصى استهلاك للذاكرة خاصًا بهذا التشغيل وحده
+    params = model_cache.resolve_params({"engine": engine})
+    _, X_train, X_test, y_train, y_test = model_cache.prepare(synthetic.generate(rows, success_rate), params)
+    X_train, X_test, y_train, y_test = (np.asarray(a) for a in (X_train, X_test, y_train, y_test))
+    categorical = [model_cache.FEATURES.index(col) for col in model_cache.CATEGORICAL]
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    X_train, y_train = engines.ENGINES[engine].balance(X_train, y_train, params)
+    model = engines.ENGINES[engine].fit(X_train, y_train, params, categorical, n_jobs=n_jobs)
+    fit_s = time.perf_counter() - start
+    return {
+        "engine": engine,
+        "rows": rows,
+        "fit_s": round(fit_s, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "fit_rss_delta_mb": round(peak_rss_mb() - baseline, 1),
+        "accuracy": round(float((model.predict(X_test) == y_test).mean()), 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="مقارنة محركات التدريب حسب حجم البيانات")
+    parser.add_argument("--engines", nargs="+", choices=list(engines.ENGINES), default=list(engines.ENGINES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[500, 5_000, 50_000, 500_000, 1_000_000, 10_000_000])
+    parser.add_argument("--n-jobs", type=int, default=model_cache.N_JOBS)
+    parser.add_argument("--success-rate", type=float, default=0.5, help="نسبة الحملات الناجحة (0-1)")
+    parser.add_argument("--timeout", type=float, default=3 * 3600, help="أقصى زمن لكل تشغيل بالثواني")
+    parser.add_argument("--json", help="حفظ النتائج في ملف JSON")
+    parser.add_argument("--worker", nargs=2, metavar=("ENGINE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_one(args.worker[0], int(args.worker[1]), args.n_jobs, args.success_rate)))
+        return
+
+    results = []
+    for rows in args.sizes:
+        for engine in args.engines:
+            cmd = [sys.executable, "-m", "benchmarks.compare_engines", "--worker", engine, str(rows),
+                   "--n-jobs", str(args.n_jobs), "--success-rate", str(args.success_rate)]
+            try:
+                done = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout, check=True)
+                result = json.loads(done.stdout.strip().splitlines()[-1])
+            except subprocess.TimeoutExpired:
+                result = {"engine": engine, "rows": rows, "error": f"timeout > {args.timeout:.0f} s"}
+            except subprocess.CalledProcessError as e:
+                result = {"engine": engine, "rows": rows, "error": e.stderr.strip().splitlines()[-1]}
+            results.append(result)
+            print(" | ".join(f"{k}={v}" for k, v in result.items()), flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# ⏱️ قياس زمن كل مرحلة من مراحل التطبيق على بيانات اصطناعية بأحجام مختلفة، والنتائج بصيغة JSON
+# التشغيل من جذر المستودع: python -m benchmarks.run --sizes 500 100000 1000000 -o نتائج.json
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+# المحركات تستورد مكتباتها عند أول استخدام؛ استيرادها هنا حتى لا يُحسب زمن الاستيراد ضمن أول مرحلة
+import imblearn.over_sampling
+import sklearn.ensemble
+import sklearn.inspection
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+
+import batch
+import charts
+import engines
+import ingest
+import model_cache
+from stats_index import StatsIndex
+from benchmarks import synthetic
+
+
+class Stages:
+    # 📌 زمن كل مرحلة بالثواني حسب اسمها، بترتيب التنفيذ
+    def __init__(self):
+        self.times = {}
+
+    def run(self, name, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.times[name] = round(time.perf_counter() - start, 6)
+        return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def bench(rows, success_rate, seed, params, work_dir, single_calls, batch_rows):
+    stages = Stages()
+    path = synthetic.write_csv(work_dir / f"حملات_{rows}.csv", rows, success_rate, seed)
+    engine = engines.ENGINES[params["engine"]]
+
+    # 📥 التحميل: قراءة CSV مباشرة كما كان التطبيق يفعل، ثم بناء الأعمدة المخزنة وفتحها
+    stages.run("csv_read", lambda: pd.read_csv(path))
+    df = stages.run("load_cold", lambda: ingest.load(path, cache_dir=work_dir / "data"))
+    df = stages.run("load_warm", lambda: ingest.load(path, cache_dir=work_dir / "data"))
+
+    # 🧠 التدريب مرحلة مرحلة
+    X, encoders = stages.run("encode", lambda: model_cache.fit_encoders(df))
+    X_train, X_test, y_train, y_test = stages.run("split", lambda: train_test_split(
+        X.to_numpy(), df[model_cache.TARGET].to_numpy(), test_size=params["test_size"],
+        random_state=params["random_state"]))
+    X_train, y_train = stages.run("balance", lambda: engine.balance(X_train, y_train, params))
+    categorical = [model_cache.FEATURES.index(col) for col in model_cache.CATEGORICAL]
+    model = stages.run("fit", lambda: engine.fit(X_train, y_train, params, categorical, n_jobs=model_cache.N_JOBS))
+    accuracy = stages.run("accuracy", lambda: accuracy_score(y_test, model.predict(X_test)))
+    flat = stages.run("flatten", lambda: engine.flatten(model, X_test))
+    importances = stages.run("importances", lambda: engine.importances(model, X_test, y_test))
+    bundle = {
+        "key": f"bench-{rows}-{success_rate}-{seed}-{params['engine']}",
+        "model": model,
+        "flat": flat,
+        "encoders": encoders,
+        "vocab": {col: {cls: i for i, cls in enumerate(encoders[col].classes_)} for col in model_cache.CATEGORICAL},
+        "importances": pd.DataFrame({"الميزة": model_cache.FEATURES, "الأهمية": importances}).sort_values(
+            by="الأهمية", ascending=False),
+    }
+
+    # 🔮 التنبؤ: حملة واحدة (متوسط عدة استدعاءات) ودفعة كاملة
+    values = [20_000, synthetic.القنوات[0], synthetic.الفئات_العمرية[0], 30, synthetic.حالات_السوق[0]]
+    stages.run("predict_single", lambda: [model_cache.predict_proba(bundle, model_cache.encode_row(bundle, values))
+                                          for _ in range(single_calls)])
+    stages.times["predict_single"] = round(stages.times["predict_single"] / single_calls, 6)
+    chunk = df.head(batch_rows).drop(columns=model_cache.TARGET)
+    stages.run("predict_batch", lambda: batch.score_chunk(bundle, chunk))
+
+    # 📊 التجميعات والمخططات التي تعرضها التبويبات
+    stats = stages.run("aggregates", lambda: StatsIndex.from_frame(df))
+    stages.run("aggregates_query", lambda: (stats.mean_budget(0), stats.mean_budget(1), stats.budget_quantiles(),
+                                            stats.class_rates("القناة", 0)))
+    stages.run("chart_importance", lambda: charts.importance_chart(bundle))
+    stages.run("chart_budget", lambda: charts.budget_chart(df, bundle["key"]))
+    stages.run("chart_channels", lambda: charts.channels_chart(df, bundle["key"]))
+
+    return {
+        "rows": rows,
+        "success_rate": success_rate,
+        "engine": params["engine"],
+        "accuracy": round(float(accuracy), 4),
+        "batch_rows": len(chunk),
+        "stages_s": stages.times,
+        "total_s": round(sum(stages.times.values()), 6),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="قياس زمن مراحل التطبيق على بيانات اصطناعية")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[500, 10_000, 100_000])
+    parser.add_argument("--success-rate", type=float, default=0.5, help="نسبة الحملات الناجحة (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=list(engines.ENGINES), default=model_cache.DEFAULT_PARAMS["engine"])
+    parser.add_argument("--single-calls", type=int, default=200, help="عدد استدعاءات التنبؤ الفردي")
+    parser.add_argument("--batch-rows", type=int, default=100_000, help="عدد صفوف التنبؤ الدفعي")
+    parser.add_argument("-o", "--output", help="ملف JSON للنتائج (الافتراضي: المخرج القياسي)")
+    args = parser.parse_args(argv)
+
+    params = model_cache.resolve_params({"engine": args.engine})
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.sizes:
+            result = bench(rows, args.success_rate, args.seed, params, Path(work_dir), args.single_calls,
+                           args.batch_rows)
+            results.append(result)
+            print(f"{rows} صف: " + " | ".join(f"{k} {v:.4f}" for k, v in result["stages_s"].items()), file=sys.stderr, flush=True)
+
+    report = {
+        "environment": environment(),
+        "params": params,
+        "n_jobs": model_cache.N_JOBS,
+        # ru_maxrss بالكيلوبايت على لينكس
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
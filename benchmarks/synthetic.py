@@ -0,0 +1,71 @@
+# 🧪 توليد بيانات حملات اصطناعية بنفس أعمدة وفئات ملف الحملات الحقيقي وبأي حجم ونسبة نجاح
+# التشغيل من جذر المستودع: python -m benchmarks.synthetic --rows 1000000 -o حملات_اصطناعية.csv
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import ingest
+
+القنوات = ["إعلانات رقمية", "وسائل التواصل", "تلفزيون", "راديو", "بريد إلكتروني"]
+الفئات_العمرية = ["18-24", "25-34", "35-44", "45-54", "55+"]
+حالات_السوق = ["طبيعية", "أزمة كورونا", "أزمة اقتصادية"]
+
+BUDGET_RANGE = (1_000, 1_000_000_000)
+DURATION_RANGE = (7, 100)
+
+# 📌 أثر كل فئة على فرصة النجاح (لوغاريتم النسبة)، حتى يكون في البيانات نمط يتعلمه النموذج
+تأثير_القناة = dict(zip(القنوات, [0.4, 0.6, 0.1, -0.2, -0.5]))
+تأثير_الجمهور = dict(zip(الفئات_العمرية, [0.3, 0.5, 0.0, -0.2, -0.4]))
+تأثير_السوق = dict(zip(حالات_السوق, [0.6, -0.7, -0.5]))
+
+
+def generate(rows, success_rate=0.5, seed=0):
+    rng = np.random.default_rng(seed)
+    # الميزانية: توزيع لوغاريتمي حول ~20 ألف كما في البيانات الحقيقية مع ذيل طويل حتى مليار
+    budget = np.clip(rng.lognormal(np.log(20_000), 1.5, rows), *BUDGET_RANGE).astype(np.int32)
+    duration = rng.integers(DURATION_RANGE[0], DURATION_RANGE[1] + 1, rows, dtype=np.int32)
+    channel = rng.integers(0, len(القنوات), rows)
+    audience = rng.integers(0, len(الفئات_العمرية), rows)
+    market = rng.integers(0, len(حالات_السوق), rows)
+
+    score = (np.asarray(list(تأثير_القناة.values()))[channel]
+             + np.asarray(list(تأثير_الجمهور.values()))[audience]
+             + np.asarray(list(تأثير_السوق.values()))[market]
+             + 0.4 * (np.log(budget) - np.log(20_000))
+             - 0.01 * np.abs(duration - 30)
+             + rng.logistic(0, 1, rows))
+    # ✅ عتبة النجاح تُختار من توزيع الدرجات نفسه فتكون نسبة النجاح هي المطلوبة تمامًا (عدم التوازن)
+    success = score > np.quantile(score, 1 - success_rate) if rows else np.zeros(0, bool)
+
+    return pd.DataFrame({
+        "الميزانية": budget,
+        "القناة": pd.Categorical.from_codes(channel, القنوات),
+        "الجمهور": pd.Categorical.from_codes(audience, الفئات_العمرية),
+        "المدة": duration,
+        "حالة_السوق": pd.Categorical.from_codes(market, حالات_السوق),
+        "النجاح": success.astype(np.int8),
+    })[ingest.COLUMNS]
+
+
+def write_csv(path, rows, success_rate=0.5, seed=0, chunk_rows=1_000_000):
+    # الكتابة على دفعات حتى لا يحتاج ملف بعشرة ملايين صف إلى إطار واحد في الذاكرة
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, start in enumerate(range(0, max(rows, 1), chunk_rows)):
+            chunk = generate(min(chunk_rows, rows - start), success_rate, seed + i)
+            chunk.to_csv(f, index=False, header=i == 0)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="توليد ملف حملات اصطناعي بنفس أعمدة البيانات الحقيقية")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--success-rate", type=float, default=0.5, help="نسبة الحملات الناجحة (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="حملات_اصطناعية.csv")
+    args = parser.parse_args(argv)
+    write_csv(args.output, args.rows, args.success_rate, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib
+from matplotlib.figure import Figure
+import seaborn as sns
+
+from shaping import shape, shape_series
+
+# إعداد الخط
+matplotlib.rcParams['font.family'] = 'Arial'
+matplotlib.rcParams['axes.unicode_minus'] = False
+
+# عدد المخططات المحفوظة كصور قبل حذف الأقدم استخدامًا
+MAX_ENTRIES = 32
+DPI = 200
+
+تسميات_النجاح = {0: "نجاح", 1: "فشل"}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+# الرسم يتم في خيط واحد في كل مرة (التهيئة المسبقة والجلسات)، ومن ينتظر يجد المخطط جاهزًا غالبًا
+_render_lock = threading.Lock()
+
+
+def _lookup(key):
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    return None
+
+
+def cached(key, render):
+    data = _lookup(key)
+    if data is not None:
+        return data
+    with _render_lock:
+        data = _lookup(key)
+        if data is not None:
+            return data
+        data = render()
+    with _lock:
+        _cache[key] = data
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return data
+
+
+def _render(draw, fmt="png"):
+    # 📌 Figure مستقل عن pyplot فلا يُسجَّل في أي قائمة عامة، ويُفرَّغ بعد التصدير مباشرة
+    fig = Figure()
+    ax = fig.subplots()
+    try:
+        draw(ax)
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt, dpi=DPI, bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+def _style(ax, title, xlabel, ylabel):
+    ax.set_title(shape(title), fontsize=16, fontweight='bold', fontname='Arial', loc='center')
+    ax.set_xlabel(shape(xlabel), fontsize=14, fontname='Arial')
+    ax.set_ylabel(shape(ylabel), fontsize=14, fontname='Arial')
+    ax.tick_params(labelsize=12)
+
+
+def draw_importance(ax, importance_df):
+    data = importance_df.assign(الميزة=importance_df["الميزة"].map(shape))
+    sns.barplot(x="الأهمية", y="الميزة", hue="الميزة", data=data, palette="Blues", legend=False, ax=ax)
+    _style(ax, "مخطط أهمية الميزات", "الأهمية", "الميزة")
+    # قلب ترتيب الميزات لعرضها من الأعلى للأسفل
+    ax.invert_yaxis()
+
+
+def draw_budget(ax, df):
+    النجاح_معدل = shape_series(df["النجاح"], تسميات_النجاح)
+    sns.boxplot(x=النجاح_معدل, y=df["الميزانية"], hue=النجاح_معدل, palette="Blues", legend=False, ax=ax)
+    _style(ax, "تأثير الميزانية على نجاح الحملة", "النجاح", "الميزانية")
+
+
+def draw_channels(ax, df):
+    القناة_معدلة = shape_series(df["القناة"])
+    النجاح_معدل = shape_series(df["النجاح"], تسميات_النجاح)
+    sns.countplot(x=القناة_معدلة, hue=النجاح_معدل, palette="Blues", ax=ax)
+    _style(ax, "نجاح الحملات حسب القناة", "القناة التسويقية", "عدد الحملات")
+    ax.legend(title=shape("النجاح"), fontsize=12, title_fontsize=14, loc="upper right")
+
+
+def draw_heatmap(ax, matrix, budgets, durations):
+    image = ax.imshow(matrix, aspect="auto", origin="lower", cmap="Blues", vmin=0, vmax=1,
+                      extent=(budgets[0], budgets[-1], -0.5, len(durations) - 0.5))
+    ax.set_yticks(range(len(durations)), [str(d) for d in durations])
+    ax.figure.colorbar(image, ax=ax).set_label(shape("احتمالية النجاح"), fontsize=12)
+    _style(ax, "احتمالية النجاح حسب الميزانية والمدة", "الميزانية", "المدة (أيام)")
+
+
+def warm():
+    # 🔥 تحميل الخطوط وواجهة الرسم وتشكيل النصوص مسبقًا برسم مخطط صغير لا يُحفظ
+    with _render_lock:
+        _render(lambda ax: _style(ax, "النجاح", "الميزانية", "القناة"))
+
+
+# 📊 مخطط الأهمية يتغير مع النموذج، ومخططا البيانات يتغيران مع نسخة البيانات فقط
+def importance_chart(bundle, fmt="png"):
+    return cached(("importance", bundle["key"], fmt), lambda: _render(lambda ax: draw_importance(ax, bundle["importances"]), fmt))
+
+
+def budget_chart(df, version, fmt="png"):
+    return cached(("budget", version, fmt), lambda: _render(lambda ax: draw_budget(ax, df), fmt))
+
+
+def channels_chart(df, version, fmt="png"):
+    return cached(("channels", version, fmt), lambda: _render(lambda ax: draw_channels(ax, df), fmt))
+
+
+def heatmap_chart(key, matrix, budgets, durations, fmt="png"):
+    return cached(("heatmap", key, fmt), lambda: _render(lambda ax: draw_heatmap(ax, matrix, budgets, durations), fmt))
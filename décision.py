@@ -1,17 +1,14 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-import arabic_reshaper
-from bidi.algorithm import get_display
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score
-from sklearn.metrics import classification_report
-from sklearn.metrics import precision_recall_fscore_support
-from imblearn.over_sampling import SMOTE
+import io
+import tempfile
+from datetime import datetime
+import engines
+import instrumentation
+from instrumentation import span
+import prewarm
+
+# 📦 مكتبات التحليل والرسم (pandas و numpy و sklearn و matplotlib...) تُستورد داخل الأجزاء التي تستخدمها،
+# فتظهر الصفحة فورًا بينما تحمّلها التهيئة المسبقة في الخلفية
 
 st.markdown("<h1 style='color: blue;'>الحملات التسويقية</h1>", unsafe_allow_html=True)
 
@@ -51,10 +48,6 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# إعداد الخط
-plt.rcParams['font.family'] = 'Arial'
-plt.rcParams['axes.unicode_minus'] = False
-
 st.title("📊 تطبيق الذكاء الاصطناعي لتحليل الحملات التسويقية")
 
 with st.expander("📘 كيفية استخدام هذا التطبيق؟"):
@@ -74,52 +67,74 @@ st.write("🔍 أدخل بيانات حملتك التسويقية للحصول
 حالة_السوق = st.selectbox("🌍 حالة السوق:", ["طبيعية", "أزمة كورونا", "أزمة اقتصادية"])
 تحليل_البيانات = st.button("🚀 تحليل البيانات")
 
+# ⚙️ محرك التدريب: الغابة العشوائية للبيانات الصغيرة، والتعزيز المتدرج أسرع بكثير على البيانات الكبيرة
+المحرك = st.sidebar.selectbox("⚙️ محرك التدريب:", list(engines.ENGINES),
+                              index=list(engines.ENGINES).index(engines.DEFAULT_ENGINE),
+                              format_func=lambda name: engines.ENGINES[name].label)
+لوحة_الأداء = st.sidebar.checkbox("⏱️ لوحة الأداء")
+
 
-@st.cache_data
 def load_real_data():
-    df = pd.read_csv("حملات_تسويقية_حقيقية.csv")
+    import ingest
+    import model_cache
+
+    # 📌 أعمدة مصنّفة الأنواع عبر memory-map تُبنى مرة واحدة لكل نسخة من الملف؛ الإطار للقراءة فقط
+    with span("load_real_data"):
+        df = ingest.load(model_cache.DATA_PATH)
     return df
+
+
+@st.cache_resource
+def get_model_service(engine):
+    import model_cache
+    from model_service import ModelService
+
+    # 📌 خدمة نموذج واحدة لكل محرك في العملية: تدريب في الخلفية ومراقبة ملف البيانات
+    return ModelService(model_cache.DATA_PATH, params={"engine": engine}).start()
+
+
+@st.cache_resource
+def load_stats_index():
+    from stats_index import StatsIndex
+
+    # 📌 فهرس مشترك بين الجلسات؛ sync يقرأ الصفوف المضافة فقط عند تغير الملف
+    return StatsIndex()
+
+
+@st.cache_resource
+def start_prewarm(engine):
+    # 🔥 مرة واحدة لكل عملية: تحميل المكتبات والبيانات والنموذج والخطوط والمخططات في الخلفية
+    return prewarm.start(params={"engine": engine})
+
+
+if prewarm.ENABLED:
+    start_prewarm(المحرك)
     
 if تحليل_البيانات:
-    # 📌 معالجة البيانات و ترميز القيم
+    import model_cache
+    import charts
+    from shaping import shape
+
+    # 📌 النموذج والمرمّزات تُبنى مرة واحدة لكل نسخة من البيانات وتُحفظ على القرص
     df = load_real_data()
-    le_القناة, le_الجمهور, le_حالة_السوق = LabelEncoder(), LabelEncoder(), LabelEncoder()
-    df["القناة"] = le_القناة.fit_transform(df["القناة"])
-    df["الجمهور"] = le_الجمهور.fit_transform(df["الجمهور"])
-    df["حالة_السوق"] = le_حالة_السوق.fit_transform(df["حالة_السوق"])
-
-    # 📌 إعداد البيانات
-    X = df[["الميزانية", "القناة", "الجمهور", "المدة", "حالة_السوق"]]
-    y = df["النجاح"]
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # تطبيق SMOTE لمعالجة توازن البيانات
-    smote = SMOTE(random_state=42)
-    X_train, y_train = smote.fit_resample(X_train, y_train)
-    
-    # 📌 تدريب النموذج
-    model = RandomForestClassifier(n_estimators=300, max_depth=10, random_state=42)
-    model.fit(X_train, y_train)
+    نسخة_البيانات = model_cache.source_digest(model_cache.DATA_PATH)
+    with span("stats_sync"):
+        stats = load_stats_index().sync(model_cache.DATA_PATH)
+    service = get_model_service(المحرك)
+    with span("model"):
+        bundle = service.get()
+    model = bundle["model"]
 
     # 📊 تحليل الميزات    
-    importances = model.feature_importances_
-    importance_df = pd.DataFrame({"الميزة": X.columns, "الأهمية": importances}).sort_values(by="الأهمية", ascending=False)
+    importance_df = bundle["importances"].copy()
 
     # 📈 دقة النموذج
-    accuracy = accuracy_score(y_test, model.predict(X_test))
-
-    # 📊 تفسير النتائج
-    for encoder, val in zip([le_القناة, le_الجمهور, le_حالة_السوق], [القناة, الجمهور, حالة_السوق]):
-        if val not in encoder.classes_:
-            encoder.classes_ = np.append(encoder.classes_, val)
+    accuracy = bundle["accuracy"]
 
     # التنبؤ
-    new_data = pd.DataFrame([[الميزانية, le_القناة.transform([القناة])[0],
-                              le_الجمهور.transform([الجمهور])[0],
-                              المدة, le_حالة_السوق.transform([حالة_السوق])[0]]],
-                            columns=['الميزانية', 'القناة', 'الجمهور', 'المدة', 'حالة_السوق'])
-
-    prediction = model.predict(new_data)[0]
+    with span("predict"):
+        new_data = model_cache.encode_row(bundle, [الميزانية, القناة, الجمهور, المدة, حالة_السوق])
+        prediction = model.classes_[model_cache.predict_proba(bundle, new_data).argmax(axis=1)][0]
     result = "نجاح" if prediction == 1 else "فشل"
 
     st.success("تم التحليل!")
@@ -127,6 +142,9 @@ if تحليل_البيانات:
     col1, col2 = st.columns(2)
     col1.metric("التوقع", result)
     col2.metric("دقة النموذج", f"{accuracy * 100:.2f} ٪")
+    st.caption(f"🧠 {engines.ENGINES[المحرك].label} | نسخة النموذج: {bundle['key'][:12]} | تاريخ التدريب: {datetime.fromtimestamp(bundle['trained_at']):%Y-%m-%d %H:%M:%S}")
+    if service.training:
+        st.caption("🔄 يتم تدريب نموذج جديد في الخلفية على البيانات المحدّثة، وسيُستخدم تلقائيًا عند جاهزيته.")
 
     analysis = f'''
     📊 **تقرير تحليلي شامل حول أداء الحملة التسويقية**  
@@ -169,40 +187,17 @@ if تحليل_البيانات:
 
             
     # إعادة تشكيل النصوص العربية
-        importance_df["الميزة"] = importance_df["الميزة"].apply(lambda x: get_display(arabic_reshaper.reshape(x)))
+        importance_df["الميزة"] = importance_df["الميزة"].map(shape)
         st.subheader("🔑 أهمية الميزات في اتخاذ القرار")
-        fig, ax = plt.subplots()
-        
-        # تفعيل دعم اللغة العربية
-        plt.rcParams['font.family'] = 'Arial'
-        plt.rcParams['axes.unicode_minus'] = False
-        
-        # إعادة تشكيل النص العربي ليظهر بشكل صحيح
-        title = get_display(arabic_reshaper.reshape("مخطط أهمية الميزات"))
-        xlabel = get_display(arabic_reshaper.reshape("الأهمية"))
-        ylabel = get_display(arabic_reshaper.reshape("الميزة"))
-
-        # رسم المخطط باستخدام Seaborn
-        sns.barplot(x="الأهمية", y="الميزة", data=importance_df, palette="Blues", ax=ax)
-
-        # ضبط عنوان المخطط والعناوين الفرعية
-        ax.set_title(title, fontsize=16, fontweight='bold', fontname='Arial', loc='center')
-        ax.set_xlabel(xlabel, fontsize=14, fontname='Arial')
-        ax.set_ylabel(ylabel, fontsize=14, fontname='Arial')
-
-        # ضبط اتجاه النص على المحاور
-        plt.xticks(fontsize=12, fontname='Arial')
-        plt.yticks(fontsize=12, fontname='Arial')
-        
-        # قلب ترتيب الميزات لعرضها من الأعلى للأسفل
-        plt.gca().invert_yaxis()
-    
-        st.pyplot(fig)
+
+        # 📊 المخطط يُرسم مرة واحدة لكل نموذج ويُعرض من الذاكرة كصورة
+        with span("tab.importance"):
+            st.image(charts.importance_chart(bundle), width="stretch")
 
         # 📝 تحليل مخطط أهمية الميزات
         # إعادة تشكيل النصوص من DataFrame لضمان ظهورها بشكل صحيح
-        أهم = get_display(arabic_reshaper.reshape(importance_df.iloc[0]["الميزة"]))
-        أقل = get_display(arabic_reshaper.reshape(importance_df.iloc[-1]["الميزة"]))
+        أهم = shape(importance_df.iloc[0]["الميزة"])
+        أقل = shape(importance_df.iloc[-1]["الميزة"])
 
 
         st.markdown(f"""
@@ -231,38 +226,17 @@ if تحليل_البيانات:
     with tabs[1]:    
     # 📊 رسم العلاقة بين الميزانية والنجاح
         st.subheader("💸 تأثير الميزانية على نجاح الحملة")
-        fig2, ax2 = plt.subplots()
-    
-    # تفعيل دعم اللغة العربية
-        plt.rcParams['font.family'] = 'Arial'
-        plt.rcParams['axes.unicode_minus'] = False
-
-    # رسم المخطط مع تعديل التصنيفات
-        df["النجاح_معدل"] = df["النجاح"].map({0: "نجاح", 1: "فشل"}).apply(lambda x: get_display(arabic_reshaper.reshape(x)))
-        sns.boxplot(x="النجاح_معدل", y="الميزانية", data=df, palette="Blues", ax=ax2)
 
-    # إعادة تشكيل النص العربي ليظهر بشكل صحيح
-        title = get_display(arabic_reshaper.reshape("تأثير الميزانية على نجاح الحملة"))
-        xlabel = get_display(arabic_reshaper.reshape("النجاح"))
-        ylabel = get_display(arabic_reshaper.reshape("الميزانية"))
+    # 📊 المخطط يُرسم مرة واحدة لكل نسخة من البيانات
+        with span("tab.budget"):
+            st.image(charts.budget_chart(df, نسخة_البيانات), width="stretch")
 
-    # ضبط عنوان المخطط والعناوين الفرعية
-        ax2.set_title(title, fontsize=16, fontweight='bold', fontname='Arial', loc='center')
-        ax2.set_xlabel(xlabel, fontsize=14, fontname='Arial')
-        ax2.set_ylabel(ylabel, fontsize=14, fontname='Arial')
-
-    # ضبط اتجاه النص على المحاور
-        plt.xticks(fontsize=12, fontname='Arial')
-        plt.yticks(fontsize=12, fontname='Arial')
-
-        st.pyplot(fig2)
-
-    # 📝 تحويل القيم الرقمية إلى نصوص
-        df["النجاح_نصي"] = df["النجاح"].map({1: "فشل", 0: "نجاح"})
-
-    # 📝 تحليل العلاقة بين الميزانية والنجاح
-        متوسط_ميزانية_النجاح = df[df["النجاح_نصي"] == "نجاح"]["الميزانية"].mean()
-        متوسط_ميزانية_الفشل = df[df["النجاح_نصي"] == "فشل"]["الميزانية"].mean()
+    # 📝 تحليل العلاقة بين الميزانية والنجاح (من الفهرس الإحصائي: 0 = نجاح، 1 = فشل)
+        with span("tab.budget_stats"):
+            متوسط_ميزانية_النجاح = stats.mean_budget(0)
+            متوسط_ميزانية_الفشل = stats.mean_budget(1)
+            ربع_أدنى, وسيط, ربع_أعلى = stats.budget_quantiles()
+        st.caption(f"توزيع الميزانية: الربع الأدنى ≈ {ربع_أدنى:,.0f} | الوسيط ≈ {وسيط:,.0f} | الربع الأعلى ≈ {ربع_أعلى:,.0f} درهم")
         
         st.markdown(f"""
         🔍 **تحليل تأثير الميزانية على نجاح الحملات التسويقية:**  
@@ -287,51 +261,14 @@ if تحليل_البيانات:
     with tabs[2]:
     # 📡 تأثير القناة التسويقية على نجاح الحملة
         st.subheader("📡 تأثير القناة التسويقية على نجاح الحملة")
-        fig3, ax3 = plt.subplots()
-
-    # تفعيل دعم اللغة العربية
-        plt.rcParams['font.family'] = 'Arial'
-        plt.rcParams['axes.unicode_minus'] = False
 
-    # إعادة تشكيل النص العربي ليظهر بشكل صحيح
-        title = get_display(arabic_reshaper.reshape("نجاح الحملات حسب القناة"))
-        xlabel = get_display(arabic_reshaper.reshape("القناة التسويقية"))
-        ylabel = get_display(arabic_reshaper.reshape("عدد الحملات"))
-        legend_title = get_display(arabic_reshaper.reshape("النجاح"))
+    # 📊 المخطط يُرسم مرة واحدة لكل نسخة من البيانات
+        with span("tab.channels"):
+            st.image(charts.channels_chart(df, نسخة_البيانات), width="stretch")
 
-    # إعادة تشكيل النصوص العربية في القناة والنجاح
-        df["القناة_معدلة"] = df["القناة"].map({
-            0: "إعلانات رقمية", 1: "وسائل التواصل", 2: "تلفزيون", 3: "راديو", 4: "بريد إلكتروني"
-        }).apply(lambda x: get_display(arabic_reshaper.reshape(x)))
-        df["النجاح_معدل"] = df["النجاح"].map({0: "نجاح", 1: "فشل"}).apply(lambda x: get_display(arabic_reshaper.reshape(x)))
-
-    # رسم المخطط مع استخدام الأعمدة المعدلة
-        sns.countplot(data=df, x="القناة_معدلة", hue="النجاح_معدل", palette="Blues", ax=ax3)
-
-    # إعادة تشكيل النصوص لعناوين المخطط
-        ax3.set_title(get_display(arabic_reshaper.reshape("نجاح الحملات حسب القناة")), fontsize=16, fontweight='bold')
-        ax3.set_xlabel(get_display(arabic_reshaper.reshape("القناة التسويقية")), fontsize=14)
-        ax3.set_ylabel(get_display(arabic_reshaper.reshape("عدد الحملات")), fontsize=14)
-
-    # إضافة وسيلة الإيضاح
-        ax3.legend(title=get_display(arabic_reshaper.reshape("النجاح")), fontsize=12, title_fontsize=14, loc="upper right")
-
-    # ضبط إعدادات الخطوط
-        plt.xticks(fontsize=12)
-        plt.yticks(fontsize=12)
-
-        st.pyplot(fig3)
-
-    # Convert back 'القناة' to categorical for proper ordering
-        df["القناة_نص"] = df["القناة"].map({
-            0: "إعلانات رقمية", 1: "وسائل التواصل", 2: "تلفزيون", 3: "راديو", 4: "بريد إلكتروني"
-        }).astype("category")
-
-    # ✅ تحويل النجاح إلى نصوص مفهومة
-        df["النجاح_نص"] = df["النجاح"].map({1: "فشل", 0: "نجاح"})
-    
-    # ✅ حساب معدل النجاح الصحيح
-        معدلات = df.groupby("القناة_نص")["النجاح_نص"].apply(lambda x: (x == "نجاح").mean())
+    # ✅ حساب معدل النجاح لكل قناة من الفهرس الإحصائي
+        with span("tab.channels_stats"):
+            معدلات = stats.class_rates("القناة", 0)
         أفضل = معدلات.idxmax()
         معدل_نجاح_أفضل_قناة = معدلات.max() * 100
         أسوأ = معدلات.idxmin()
@@ -354,3 +291,96 @@ if تحليل_البيانات:
 
 else:
     st.info("👆 يرجى إدخال بيانات الحملة التسويقية ثم الضغط على زر 'تحليل البيانات' للحصول على التحليل الشامل.")
+
+# 🧭 استكشاف السيناريوهات: شبكة كاملة من الميزانيات والمدد والقنوات تُقيَّم دفعة واحدة
+with st.expander("🧭 استكشاف السيناريوهات (الميزانية × المدة × القناة)"):
+    col_a, col_b = st.columns(2)
+    أدنى_ميزانية = col_a.number_input("أدنى ميزانية:", min_value=1000, max_value=1000000000, value=1000, step=1000)
+    أعلى_ميزانية = col_b.number_input("أعلى ميزانية:", min_value=1000, max_value=1000000000, value=100000, step=1000)
+    عدد_الميزانيات = st.slider("عدد قيم الميزانية في الشبكة:", min_value=10, max_value=1000, value=200, step=10)
+    الهدف = st.slider("🎯 احتمالية النجاح المستهدفة:", min_value=0.5, max_value=0.99, value=0.7, step=0.01)
+    if st.checkbox("🧭 عرض السيناريوهات") and أعلى_ميزانية > أدنى_ميزانية:
+        import numpy as np
+        import pandas as pd
+        import charts
+        import sweep
+
+        bundle = get_model_service(المحرك).get()
+        الميزانيات = sweep.budget_axis(أدنى_ميزانية, أعلى_ميزانية, عدد_الميزانيات)
+        with span("sweep"):
+            نتيجة = sweep.sweep(bundle, الميزانيات)
+        st.caption(f"تم تقييم {نتيجة['proba'].size:,} سيناريو | نسخة النموذج: {bundle['key'][:12]}")
+
+        if all(val in نتيجة[col] for col, val in [("القناة", القناة), ("الجمهور", الجمهور), ("حالة_السوق", حالة_السوق)]):
+            i_قناة = نتيجة["القناة"].index(القناة)
+            i_جمهور = نتيجة["الجمهور"].index(الجمهور)
+            i_سوق = نتيجة["حالة_السوق"].index(حالة_السوق)
+
+            st.subheader(f"📈 {القناة} | {الجمهور} | {حالة_السوق}")
+            مفتاح = (bundle["key"], الميزانيات.tobytes(), i_قناة, i_جمهور, i_سوق)
+            st.image(charts.heatmap_chart(مفتاح, نتيجة["proba"][i_قناة, i_جمهور, i_سوق], الميزانيات, sweep.DURATIONS),
+                     width="stretch")
+
+            # 💰 أقل ميزانية تحقق الهدف لكل قناة ومدة (للفئة وحالة السوق المختارتين)
+            أقل_ميزانية = sweep.min_budget(نتيجة, الهدف)[:, i_جمهور, i_سوق]
+            جدول = pd.DataFrame(أقل_ميزانية, index=نتيجة["القناة"], columns=[f"{d} يوم" for d in sweep.DURATIONS])
+            st.markdown(f"### 💰 أقل ميزانية تحقق احتمالية نجاح {الهدف * 100:.0f}٪")
+            st.dataframe(جدول.style.format("{:,.0f}", na_rep="—"))
+            if np.isfinite(أقل_ميزانية).any():
+                قناة, مدة = np.unravel_index(np.nanargmin(أقل_ميزانية), أقل_ميزانية.shape)
+                st.success(f"أقل ميزانية تحقق الهدف: **{أقل_ميزانية[قناة, مدة]:,.0f} درهم** عبر **{نتيجة['القناة'][قناة]}** لمدة **{sweep.DURATIONS[مدة]} يوم**.")
+            else:
+                st.warning("لا توجد ميزانية ضمن النطاق المحدد تحقق الاحتمالية المستهدفة.")
+
+# 📂 تقييم دفعة كاملة من الحملات المرشحة
+with st.expander("📂 تقييم دفعة من الحملات (CSV / Parquet)"):
+    st.markdown("ارفع ملفًا بنفس أعمدة بيانات الحملات (بدون عمود النجاح) للحصول على احتمال النجاح لكل حملة.")
+    ملف_الدفعة = st.file_uploader("ملف الحملات:", type=["csv", "parquet"])
+    if ملف_الدفعة is not None and st.button("📂 تقييم الملف"):
+        import batch
+
+        bundle = get_model_service(المحرك).get()
+        # الكتابة بترميز utf-8-sig في ملف ثنائي وتمرير البايتات كما هي؛ لو مُرِّر الملف النصي لأعاد
+        # streamlit ترميزه بـ utf-8 وضاعت علامة BOM التي يحتاجها Excel لعرض العربية
+        with tempfile.TemporaryFile() as ملف_مؤقت:
+            نتائج = io.TextIOWrapper(ملف_مؤقت, encoding="utf-8-sig", newline="")
+            try:
+                with span("batch"):
+                    عدد_الحملات = batch.score_stream(bundle, ملف_الدفعة, نتائج)
+            except ValueError as خطأ:
+                عدد_الحملات = None
+                st.error(f"تعذر تقييم الملف: {خطأ}")
+            # detach يفرّغ ما تبقى في المخزن ويترك الملف الثنائي مفتوحًا
+            نتائج.detach()
+            ملف_مؤقت.seek(0)
+            بيانات_النتائج = ملف_مؤقت.read()
+        if عدد_الحملات is not None:
+            st.success(f"تم تقييم {عدد_الحملات} حملة!")
+            st.download_button("⬇️ تحميل النتائج", بيانات_النتائج, file_name="نتائج_الحملات.csv", mime="text/csv")
+
+# ⏱️ لوحة الأداء: آخر المراحل المسجلة في هذه العملية (بما فيها التدريب في الخلفية) وإجمالي كل مرحلة
+if لوحة_الأداء:
+    import pandas as pd
+
+    ميغابايت = 1024 * 1024
+    مراحل = pd.DataFrame(instrumentation.recorder.recent(30))
+    if مراحل.empty:
+        st.sidebar.info("لا توجد مراحل مسجلة بعد.")
+    else:
+        st.sidebar.markdown("### ⏱️ آخر المراحل")
+        st.sidebar.dataframe(pd.DataFrame({
+            "المرحلة": مراحل["stage"],
+            "الزمن (مللي ث)": (مراحل["wall_s"] * 1000).round(1),
+            "معالج الخيط (مللي ث)": (مراحل["cpu_s"] * 1000).round(1),
+            "معالج العملية (مللي ث)": (مراحل["process_cpu_s"] * 1000).round(1),
+            "زيادة الذروة (م.ب)": (مراحل["peak_rss_delta_bytes"] / ميغابايت).round(1),
+            "الذاكرة (م.ب)": (مراحل["rss_bytes"] / ميغابايت).round(1),
+        }), hide_index=True)
+        إجمالي = pd.DataFrame(instrumentation.recorder.summary())
+        st.sidebar.markdown("### 📊 إجمالي كل مرحلة")
+        st.sidebar.dataframe(pd.DataFrame({
+            "المرحلة": إجمالي["stage"],
+            "المرات": إجمالي["calls"],
+            "المتوسط (مللي ث)": (إجمالي["wall_s"] / إجمالي["calls"] * 1000).round(1),
+            "الأبطأ (مللي ث)": (إجمالي["max_wall_s"] * 1000).round(1),
+        }), hide_index=True)
@@ -0,0 +1,100 @@
+import os
+
+# 📦 هذا الملف يُستورد عند فتح الصفحة (أسماء المحركات في القائمة الجانبية)، لذلك تُستورد
+# sklearn و imblearn داخل الدوال عند أول تدريب فقط
+
+
+class RandomForestSmote:
+    # 🌲 المحرك الافتراضي: موازنة البيانات بـ SMOTE ثم غابة عشوائية
+    label = "غابة عشوائية + SMOTE"
+    defaults = {"n_estimators": 300, "max_depth": 10}
+
+    def balance(self, X_train, y_train, params):
+        from imblearn.over_sampling import SMOTE
+
+        # تطبيق SMOTE لمعالجة توازن البيانات
+        smote = SMOTE(random_state=params["random_state"])
+        return smote.fit_resample(X_train, y_train)
+
+    def fit(self, X_train, y_train, params, categorical, n_jobs=None):
+        from sklearn.ensemble import RandomForestClassifier
+
+        model = RandomForestClassifier(n_estimators=params["n_estimators"], max_depth=params["max_depth"],
+                                       random_state=params["random_state"], n_jobs=n_jobs)
+        model.fit(X_train, y_train)
+        return model
+
+    def importances(self, model, X_test, y_test):
+        return model.feature_importances_
+
+    def flatten(self, model, X_test=None):
+        import flat_forest
+
+        # 📌 نسخة مسطّحة من الغابة للتنبؤ السريع، مع التحقق من تطابقها مع sklearn عند التدريب
+        flat = flat_forest.FlatForest.from_sklearn(model)
+        if X_test is not None:
+            flat_forest.check(flat, model, X_test)
+        return flat
+
+    def thresholds(self, model):
+        # المسح يستخدم الغابة المسطّحة التي تضغط المحاور بنفسها
+        return None
+
+
+class HistGradientBoosting:
+    # 📈 للبيانات الكبيرة: تعزيز متدرج بالمدرجات مع دعم أصلي للفئات، وأوزان للفئات بدل SMOTE، وإيقاف مبكر
+    label = "تعزيز متدرج بالمدرجات"
+    defaults = {"max_iter": 500, "learning_rate": 0.1, "max_leaf_nodes": 31, "early_stopping": True}
+
+    # أقصى عدد صفوف لحساب أهمية الميزات بالتبديل
+    IMPORTANCE_ROWS = 10_000
+
+    def balance(self, X_train, y_train, params):
+        # التوازن يتم بأوزان الفئات أثناء التدريب
+        return X_train, y_train
+
+    def fit(self, X_train, y_train, params, categorical, n_jobs=None):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        model = HistGradientBoostingClassifier(
+            max_iter=params["max_iter"], learning_rate=params["learning_rate"],
+            max_leaf_nodes=params["max_leaf_nodes"], early_stopping=params["early_stopping"],
+            categorical_features=categorical, class_weight="balanced", random_state=params["random_state"])
+        model.fit(X_train, y_train)
+        return model
+
+    def importances(self, model, X_test, y_test):
+        import numpy as np
+        from sklearn.inspection import permutation_importance
+
+        # لا توجد أهمية ميزات مدمجة، فتُقدَّر بالتبديل على عينة من بيانات الاختبار
+        if len(X_test) > self.IMPORTANCE_ROWS:
+            rows = np.random.default_rng(0).choice(len(X_test), self.IMPORTANCE_ROWS, replace=False)
+            X_test, y_test = X_test[rows], y_test[rows]
+        result = permutation_importance(model, X_test, y_test, n_repeats=5, random_state=0)
+        return np.clip(result.importances_mean, 0, None)
+
+    def flatten(self, model, X_test=None):
+        return None
+
+    def thresholds(self, model):
+        import numpy as np
+
+        # عتبات التقسيم العددية التي تستخدمها الأشجار فعلًا لكل ميزة، مرتبة تصاعديًا (المسار يسار عند x <= العتبة)
+        nodes = np.concatenate([predictor.nodes for iteration in model._predictors for predictor in iteration])
+        split = (nodes["is_leaf"] == 0) & (nodes["is_categorical"] == 0)
+        # مع الميزات الفئوية يعيد sklearn ترتيب الأعمدة داخل الأشجار: الفئوية أولًا ثم العددية
+        internal = np.arange(model.n_features_in_)
+        if getattr(model, "_preprocessor", None) is not None:
+            internal = np.concatenate([np.flatnonzero(model.is_categorical_), np.flatnonzero(~model.is_categorical_)])
+        thresholds = [None] * model.n_features_in_
+        for index, feature in enumerate(internal):
+            thresholds[feature] = np.unique(nodes["num_threshold"][split & (nodes["feature_idx"] == index)])
+        return thresholds
+
+
+ENGINES = {
+    "rf_smote": RandomForestSmote(),
+    "hgb": HistGradientBoosting(),
+}
+DEFAULT_ENGINE = os.environ.get("DECISION_ENGINE", "rf_smote")
@@ -0,0 +1,143 @@
+import numpy as np
+
+# عدد الصفوف في كل كتلة أثناء المرور على الأشجار (يحدد حجم المصفوفات المؤقتة)
+BLOCK_ROWS = 256
+
+
+class FlatForest:
+    # 📌 غابة قرارات مسطّحة: كل عُقد كل الأشجار في مصفوفات متجاورة،
+    # والمرور يتم دفعة واحدة على كل الأشجار وكل الصفوف بدل استدعاء كل شجرة على حدة
+    def __init__(self, feature, threshold, children, value, roots, classes, depth, missing_left):
+        self.feature = feature
+        self.threshold = threshold
+        # اتجاه القيم الناقصة (NaN) عند كل عقدة كما تعلّمه sklearn، لأن NaN <= العتبة خطأ دائمًا
+        self.missing_left = missing_left
+        # لكل عقدة خانتان متجاورتان: [يمين، يسار]، فالابن التالي هو children[2 * node + go_left]
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.depth = depth
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        features, thresholds, children, values, roots, missing_left = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            ids = np.arange(offset, offset + n, dtype=np.int32)
+            leaf = tree.children_left == -1
+
+            # الأوراق تشير إلى نفسها حتى يبقى المرور ثابتًا عندها مهما زاد عدد الخطوات
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([np.where(leaf, ids, tree.children_right + offset),
+                                             np.where(leaf, ids, tree.children_left + offset)]).ravel())
+            value = tree.value[:, 0, :]
+            values.append(value / value.sum(axis=1, keepdims=True))
+            missing_left.append(np.asarray(tree.missing_go_to_left, dtype=bool) & ~leaf)
+            roots.append(offset)
+            offset += n
+
+        index_dtype = np.int8 if forest.n_features_in_ < 128 else np.int32
+        return cls(
+            feature=np.concatenate(features).astype(index_dtype),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children).astype(np.int32),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(forest.classes_),
+            depth=max(estimator.tree_.max_depth for estimator in forest.estimators_),
+            missing_left=np.concatenate(missing_left),
+        )
+
+    def _leaves(self, X):
+        n_rows, n_features = X.shape
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots))).astype(np.intp)
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+        flat_X = X.ravel()
+        missing = np.isnan(flat_X).any()
+        for _ in range(self.depth):
+            values = flat_X.take(row_offset + self.feature.take(node))
+            go_left = values <= self.threshold.take(node)
+            if missing:
+                go_left |= np.isnan(values) & self.missing_left.take(node)
+            node = self.children.take(2 * node + go_left)
+        return node
+
+    def predict_proba(self, X):
+        # sklearn يقارن القيم بعد تحويلها إلى float32، فنفعل المثل لنحصل على نفس المسارات
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = np.empty((len(X), self.value.shape[1]))
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            proba[start:start + len(block)] = self.value[self._leaves(block)].mean(axis=1)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def predict_grid(self, axes):
+        # 📌 احتمالات كل نقاط الشبكة الكارتيزية axes (قيم مرتبة تصاعديًا لكل ميزة) بدون بناء صفوفها:
+        # كل عقدة تقسم "صندوق" القيم إلى شريحتين متجاورتين، وكل ورقة تضيف قيمتها إلى صندوقها دفعة واحدة
+        axes = [np.asarray(axis, dtype=np.float32) for axis in axes]
+
+        # ✅ القيم الواقعة بين نفس عتبتين متتاليتين تسلك نفس المسار في كل الأشجار،
+        # فتُحسب مرة واحدة لكل مجال ثم تُنسخ إلى بقية القيم في النهاية
+        internal = self.children[1::2] != np.arange(len(self.feature))
+        expand = []
+        for j, axis in enumerate(axes):
+            thresholds = np.unique(self.threshold[internal & (self.feature == j)])
+            _, first, inverse = np.unique(np.searchsorted(thresholds, axis, side="left"),
+                                          return_index=True, return_inverse=True)
+            axes[j] = axis[first]
+            expand.append(inverse)
+
+        # المحور الأطول يوضع أخيرًا في الذاكرة حتى تكون الإضافات على شرائح متصلة
+        order = np.argsort([len(axis) for axis in axes], kind="stable")
+        # في التصنيف الثنائي (أو أكثر) تُجمع كل الفئات عدا الأخيرة، والأخيرة = 1 - مجموع البقية
+        n_classes = self.value.shape[1]
+        out = np.zeros((n_classes - 1,) + tuple(len(axes[j]) for j in order))
+        leaf_values = (self.value[:, :-1] / len(self.roots)).reshape((-1, n_classes - 1) + (1,) * len(axes))
+
+        # موضع كل عتبة داخل محور ميزتها يُحسب مرة واحدة لكل العقد، ثم يتم المرور بأعداد بايثون فقط
+        split_at = np.zeros(len(self.feature), dtype=np.int64)
+        for j, axis in enumerate(axes):
+            mask = internal & (self.feature == j)
+            split_at[mask] = np.searchsorted(axis, self.threshold[mask], side="right")
+        feature, children, split_at = self.feature.tolist(), self.children.tolist(), split_at.tolist()
+
+        for root in self.roots.tolist():
+            stack = [(root, tuple((0, len(axis)) for axis in axes))]
+            while stack:
+                node, box = stack.pop()
+                right, left = children[2 * node], children[2 * node + 1]
+                if left == node:
+                    out[(slice(None),) + tuple(slice(*box[j]) for j in order)] += leaf_values[node]
+                    continue
+                j = feature[node]
+                lo, hi = box[j]
+                split = min(max(split_at[node], lo), hi)
+                if split > lo:
+                    stack.append((left, box[:j] + ((lo, split),) + box[j + 1:]))
+                if split < hi:
+                    stack.append((right, box[:j] + ((split, hi),) + box[j + 1:]))
+
+        out = np.concatenate([out, 1 - out.sum(axis=0, keepdims=True)])
+        # إعادة المحاور إلى ترتيب الميزات، مع محور الفئات في الآخر كما في predict_proba
+        out = np.moveaxis(out, 0, -1).transpose(tuple(np.argsort(order)) + (len(axes),))
+        return out[np.ix_(*expand)] if any(len(e) > len(a) for e, a in zip(expand, axes)) else out
+
+
+def check(flat, forest, X, atol=1e-9):
+    # ✅ التأكد من أن الغابة المسطّحة تعطي نفس الاحتمالات والتوقعات التي يعطيها sklearn،
+    # على الصفوف كما هي وعلى نسخة منها فيها قيمة ناقصة (NaN) في كل ميزة بالتناوب
+    X = np.asarray(X, dtype=np.float64)
+    missing = X.copy()
+    missing[np.arange(len(X)), np.arange(len(X)) % X.shape[1]] = np.nan
+    for rows in (X, missing):
+        expected = forest.predict_proba(rows)
+        np.testing.assert_allclose(flat.predict_proba(rows), expected, rtol=0, atol=atol)
+        if not np.array_equal(flat.predict(rows), forest.classes_[expected.argmax(axis=1)]):
+            raise AssertionError("FlatForest predictions differ from the sklearn forest")
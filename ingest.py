@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ترتيب الأعمدة كما في ملف الحملات
+COLUMNS = ["الميزانية", "القناة", "الجمهور", "المدة", "حالة_السوق", "النجاح"]
+
+# 📌 أنواع صريحة لكل عمود: أعداد صحيحة صغيرة للأرقام، وفئات للنصوص
+NUMERIC = {"الميزانية": np.int32, "المدة": np.int32, "النجاح": np.int8}
+CATEGORICAL = ["القناة", "الجمهور", "حالة_السوق"]
+CODE_DTYPE = np.int8
+
+CHUNK_ROWS = 1_000_000
+CACHE_DIR = Path(os.environ.get("DECISION_DATA_CACHE_DIR", ".cache/data"))
+
+# 📌 ذاكرة داخل العملية: بصمة الملف حسب (الحجم، وقت التعديل) والأعمدة المفتوحة عبر memory-map
+_digests = {}
+_columns = {}
+_lock = threading.Lock()
+
+
+def source_digest(path):
+    path = Path(path)
+    stat = path.stat()
+    stamp = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if stamp not in _digests:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _digests[stamp] = h.hexdigest()
+    return _digests[stamp]
+
+
+def _source_dir(path, cache_dir):
+    name = hashlib.sha256(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / name
+
+
+def _current(path, source_dir):
+    # ✅ البصمة تُحسب من جديد فقط إذا تغير حجم الملف أو وقت تعديله منذ آخر بناء
+    stat = Path(path).stat()
+    try:
+        stamp = json.loads((source_dir / "source.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        stamp = {}
+    if stamp.get("size") == stat.st_size and stamp.get("mtime_ns") == stat.st_mtime_ns:
+        return stamp["digest"]
+    digest = source_digest(path)
+    source_dir.mkdir(parents=True, exist_ok=True)
+    stamp = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+    (source_dir / "source.json").write_text(json.dumps(stamp), encoding="utf-8")
+    return digest
+
+
+def build(path, target, chunk_rows=CHUNK_ROWS):
+    # 📌 قراءة الملف على دفعات وكتابة كل عمود في ملف ثنائي مستقل
+    tmp = target.with_name(f"{target.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    vocab = {col: {} for col in CATEGORICAL}
+    files = {col: open(tmp / f"{col}.bin", "wb") for col in [*NUMERIC, *CATEGORICAL]}
+    rows = 0
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype={**NUMERIC, **{col: "category" for col in CATEGORICAL}}):
+            for col in NUMERIC:
+                chunk[col].to_numpy().tofile(files[col])
+            for col in CATEGORICAL:
+                # توحيد رموز الفئات بين الدفعات: كل قيمة جديدة تأخذ الرمز التالي
+                values = chunk[col].cat
+                codes = values.codes.to_numpy()
+                if (codes < 0).any():
+                    raise ValueError(f"قيم ناقصة في العمود {col}")
+                mapping = [vocab[col].setdefault(c, len(vocab[col])) for c in values.categories]
+                if len(vocab[col]) > np.iinfo(CODE_DTYPE).max:
+                    raise ValueError(f"عدد فئات العمود {col} أكبر من المسموح")
+                np.asarray(mapping, dtype=CODE_DTYPE).take(codes).tofile(files[col])
+            rows += len(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+
+    meta = {"rows": rows, "categories": {col: list(vocab[col]) for col in CATEGORICAL}}
+    (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # عملية أخرى أنهت بناء نفس النسخة قبلنا
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not (target / "meta.json").exists():
+            raise
+
+
+def _open(target):
+    meta = json.loads((target / "meta.json").read_text(encoding="utf-8"))
+    shape = (meta["rows"],)
+    columns = {}
+    for col, dtype in NUMERIC.items():
+        columns[col] = np.memmap(target / f"{col}.bin", dtype=dtype, mode="r", shape=shape) if shape[0] else np.empty(0, dtype)
+    for col in CATEGORICAL:
+        codes = np.memmap(target / f"{col}.bin", dtype=CODE_DTYPE, mode="r", shape=shape) if shape[0] else np.empty(0, CODE_DTYPE)
+        columns[col] = (codes, meta["categories"][col])
+    return columns
+
+
+def load(path, cache_dir=CACHE_DIR):
+    source_dir = _source_dir(path, cache_dir)
+    # خيط واحد فقط يبني أو يفتح نسخة البيانات، والبقية تنتظر النتيجة
+    with _lock:
+        digest = _current(path, source_dir)
+        columns = _columns.get(digest)
+        if columns is None:
+            target = source_dir / digest
+            if not (target / "meta.json").exists():
+                build(path, target)
+                # حذف النسخ القديمة لنفس الملف
+                for old in source_dir.iterdir():
+                    if old.is_dir() and old.name != digest and not old.name.endswith(".tmp"):
+                        shutil.rmtree(old, ignore_errors=True)
+            columns = _open(target)
+            _columns.clear()
+            _columns[digest] = columns
+
+    # ✅ إطار جديد في كل استدعاء فوق نفس المصفوفات (للقراءة فقط)، فلا يتغير المخزن المشترك
+    frame = {}
+    for col in COLUMNS:
+        if col in NUMERIC:
+            frame[col] = columns[col]
+        else:
+            codes, categories = columns[col]
+            frame[col] = pd.Categorical.from_codes(codes, categories=categories)
+    return pd.DataFrame(frame, copy=False)
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # غير متوفر على ويندوز
+    resource = None
+
+# 📌 التصدير اختياري: سجل JSON-lines يُدوَّر حسب الحجم، و/أو ملف نصي لـ Prometheus (textfile collector)
+LOG_PATH = os.environ.get("DECISION_SPANS_LOG")
+LOG_MAX_BYTES = int(os.environ.get("DECISION_SPANS_LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUPS = int(os.environ.get("DECISION_SPANS_LOG_BACKUPS", 5))
+PROM_PATH = os.environ.get("DECISION_PROM_FILE")
+# أقل فاصل بين كتابتين لملف Prometheus (بالثواني)، حتى لا يُكتب الملف مع كل دفعة في الخادم؛
+# ما يُسجَّل داخل الفاصل يُكتب في نهايته
+PROM_INTERVAL = float(os.environ.get("DECISION_PROM_INTERVAL", 1.0))
+
+# عدد المراحل الأخيرة المحفوظة في الذاكرة للوحة الأداء
+MAX_SPANS = 500
+
+
+def rss_bytes():
+    # الذاكرة المقيمة الحالية للعملية (لينكس فقط)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_bytes():
+    # أعلى ذاكرة مقيمة منذ بدء العملية؛ ru_maxrss بالكيلوبايت على لينكس
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _delta(after, before):
+    return after - before if after is not None and before is not None else None
+
+
+class Recorder:
+    # ⏱️ تسجيل زمن كل مرحلة (الزمن الفعلي، زمن المعالج، وزيادة الذاكرة) بأقل كلفة ممكنة.
+    # cpu_s زمن معالج الخيط الذي نفّذ المرحلة وحده؛ process_cpu_s زمن معالج العملية كلها خلال المرحلة،
+    # ويشمل الخيوط الأخرى (التدريب في الخلفية، طلبات أخرى) وخيوط المكتبات التي تعمل بالتوازي
+    def __init__(self, max_spans=MAX_SPANS, log_path=LOG_PATH, prom_path=PROM_PATH):
+        self.lock = threading.Lock()
+        self.spans = deque(maxlen=max_spans)
+        self.totals = {}
+        self.local = threading.local()
+        self.prom_path = Path(prom_path) if prom_path else None
+        self.prom_written = 0.0
+        self.prom_timer = None
+        self.logger = None
+        if log_path:
+            self.logger = logging.getLogger(f"decision.spans.{id(self)}")
+            self.logger.propagate = False
+            self.logger.setLevel(logging.INFO)
+            self.logger.addHandler(RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                       encoding="utf-8"))
+
+    @contextmanager
+    def span(self, name):
+        stack = self.local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        started = time.time()
+        rss_before, peak_before = rss_bytes(), peak_rss_bytes()
+        cpu_before, process_before, wall_before = time.thread_time(), time.process_time(), time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall_before, time.thread_time() - cpu_before
+            process_cpu = time.process_time() - process_before
+            rss_after = rss_bytes()
+            stack.pop()
+            self.record({
+                "stage": name,
+                "parent": parent,
+                "thread": threading.current_thread().name,
+                "started": started,
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "process_cpu_s": process_cpu,
+                "peak_rss_delta_bytes": _delta(peak_rss_bytes(), peak_before),
+                "rss_delta_bytes": _delta(rss_after, rss_before),
+                "rss_bytes": rss_after,
+                "error": error,
+            })
+
+    def record(self, span):
+        with self.lock:
+            self.spans.append(span)
+            total = self.totals.setdefault(span["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "process_cpu_s": 0.0,
+                                                           "max_wall_s": 0.0, "max_peak_rss_delta_bytes": 0})
+            total["calls"] += 1
+            total["wall_s"] += span["wall_s"]
+            total["cpu_s"] += span["cpu_s"]
+            total["process_cpu_s"] += span["process_cpu_s"]
+            total["max_wall_s"] = max(total["max_wall_s"], span["wall_s"])
+            total["max_peak_rss_delta_bytes"] = max(total["max_peak_rss_delta_bytes"], span["peak_rss_delta_bytes"] or 0)
+            if self.prom_path is not None and self.prom_timer is None:
+                # أول مرحلة بعد الفاصل تُكتب فورًا؛ ما يأتي قبله ينتظر كتابة واحدة مؤجلة في نهايته
+                wait = PROM_INTERVAL - (time.monotonic() - self.prom_written)
+                if wait <= 0:
+                    self._write_prometheus()
+                else:
+                    self.prom_timer = threading.Timer(wait, self._flush_prometheus)
+                    self.prom_timer.daemon = True
+                    self.prom_timer.start()
+        if self.logger is not None:
+            self.logger.info(json.dumps(span, ensure_ascii=False))
+
+    def recent(self, n=50):
+        # الأحدث أولًا
+        with self.lock:
+            return list(self.spans)[::-1][:n]
+
+    def summary(self):
+        with self.lock:
+            return [{"stage": stage, **total} for stage, total in self.totals.items()]
+
+    def _flush_prometheus(self):
+        with self.lock:
+            self.prom_timer = None
+            self._write_prometheus()
+
+    def _write_prometheus(self):
+        # ✅ الكتابة في ملف مؤقت ثم استبداله، حتى لا يقرأ المجمّع ملفًا نصف مكتوب
+        metrics = [
+            ("decision_stage_calls_total", "counter", "Number of times each stage ran.", "calls"),
+            ("decision_stage_seconds_total", "counter", "Wall time spent in each stage.", "wall_s"),
+            ("decision_stage_cpu_seconds_total", "counter", "CPU time of the thread that ran each stage.", "cpu_s"),
+            ("decision_stage_process_cpu_seconds_total", "counter",
+             "CPU time of the whole process (all threads) while each stage ran.", "process_cpu_s"),
+            ("decision_stage_max_seconds", "gauge", "Slowest single run of each stage.", "max_wall_s"),
+            ("decision_stage_max_peak_rss_delta_bytes", "gauge", "Largest peak RSS growth during a stage.",
+             "max_peak_rss_delta_bytes"),
+        ]
+        lines = []
+        for metric, kind, help_text, field in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{stage="{stage}"}} {total[field]}' for stage, total in self.totals.items()]
+        rss = rss_bytes()
+        if rss is not None:
+            lines += ["# HELP decision_process_resident_memory_bytes Resident memory of the process.",
+                      "# TYPE decision_process_resident_memory_bytes gauge",
+                      f"decision_process_resident_memory_bytes {rss}"]
+        tmp = self.prom_path.with_name(f".{self.prom_path.name}.{os.getpid()}.tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.prom_path)
+        self.prom_written = time.monotonic()
+
+
+# مسجّل واحد مشترك للعملية
+recorder = Recorder()
+span = recorder.span
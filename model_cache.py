@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from sklearn.metrics import accuracy_score
+
+import engines
+import ingest
+from instrumentation import span
+from ingest import source_digest
+
+DATA_PATH = "حملات_تسويقية_حقيقية.csv"
+FEATURES = ["الميزانية", "القناة", "الجمهور", "المدة", "حالة_السوق"]
+CATEGORICAL = ["القناة", "الجمهور", "حالة_السوق"]
+TARGET = "النجاح"
+
+# يتغير عند تغيير محتوى الحزمة المحفوظة حتى لا تُقرأ حزم قديمة
+FORMAT_VERSION = 3
+
+# معاملات التدريب (تدخل في مفتاح التخزين)؛ معاملات كل محرك الافتراضية في engines.py
+DEFAULT_PARAMS = {"engine": engines.DEFAULT_ENGINE, "test_size": 0.2, "random_state": 42}
+
+# عدد الأنوية المستخدمة في التدريب (لا يغير النتيجة فلا يدخل في المفتاح)
+N_JOBS = int(os.environ.get("DECISION_N_JOBS", -1))
+
+# إعدادات مخزن النماذج على القرص
+CACHE_DIR = Path(os.environ.get("DECISION_CACHE_DIR", ".cache/models"))
+MAX_CACHE_BYTES = int(os.environ.get("DECISION_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+MAX_CACHE_AGE = float(os.environ.get("DECISION_CACHE_MAX_AGE", 30 * 24 * 3600))
+
+# حتى هذا العدد من الصفوف تكون الغابة المسطّحة أسرع؛ بعده يتفوق تنفيذ sklearn المترجم
+FLAT_MAX_ROWS = 1024
+
+# 📌 ذاكرة داخل العملية: النماذج المحمّلة حسب المفتاح
+_loaded = {}
+_lock = threading.Lock()
+
+
+def resolve_params(params=None):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    return {**engines.ENGINES[params["engine"]].defaults, **params}
+
+
+def artifact_key(path, params=None):
+    params = resolve_params(params)
+    payload = json.dumps({"data": source_digest(path), "params": params, "format": FORMAT_VERSION}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fit_encoders(df):
+    # 📌 ترميز القيم على نسخة مستقلة حتى لا يتغير الإطار المشترك
+    X = df[FEATURES].copy()
+    encoders = {}
+    for col in CATEGORICAL:
+        encoders[col] = LabelEncoder()
+        X[col] = encoders[col].fit_transform(X[col])
+    return X, encoders
+
+
+def prepare(df, params):
+    with span("train.encoders"):
+        X, encoders = fit_encoders(df)
+    with span("train.split"):
+        y = df[TARGET]
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=params["test_size"], random_state=params["random_state"])
+    return encoders, X_train, X_test, y_train, y_test
+
+
+def train(df, params=None, n_jobs=N_JOBS):
+    params = resolve_params(params)
+    engine = engines.ENGINES[params["engine"]]
+    encoders, X_train, X_test, y_train, y_test = prepare(df, params)
+    # المحركات تعمل على مصفوفات numpy بترتيب FEATURES، مثل مسارات التنبؤ
+    X_train, X_test, y_train, y_test = (np.asarray(a) for a in (X_train, X_test, y_train, y_test))
+
+    # 📌 تدريب النموذج
+    with span("train.balance"):
+        X_train, y_train = engine.balance(X_train, y_train, params)
+    with span("train.fit"):
+        model = engine.fit(X_train, y_train, params, [FEATURES.index(col) for col in CATEGORICAL], n_jobs=n_jobs)
+    with span("train.accuracy"):
+        accuracy = accuracy_score(y_test, model.predict(X_test))
+    with span("train.flatten"):
+        flat = engine.flatten(model, X_test)
+    with span("train.importances"):
+        importance_df = pd.DataFrame({"الميزة": FEATURES, "الأهمية": engine.importances(model, X_test, y_test)}).sort_values(
+            by="الأهمية", ascending=False)
+
+    return {
+        "model": model,
+        "flat": flat,
+        "encoders": encoders,
+        "vocab": {col: {cls: i for i, cls in enumerate(encoders[col].classes_)} for col in CATEGORICAL},
+        "importances": importance_df,
+        "accuracy": accuracy,
+        "params": params,
+        "trained_at": time.time(),
+    }
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, max_age=MAX_CACHE_AGE, keep=None):
+    now = time.time()
+    entries = []
+    for path in Path(cache_dir).glob("*.joblib"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.name != keep and now - stat.st_mtime > max_age:
+            path.unlink(missing_ok=True)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    # حذف الأقدم استخدامًا حتى يعود الحجم الإجمالي تحت الحد
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if path.name == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def load_or_train(path=DATA_PATH, params=None, cache_dir=CACHE_DIR):
+    # الاستدعاءات المتزامنة لنفس المفتاح تنتظر تدريبًا واحدًا بدل تكراره
+    with _lock:
+        return _load_or_train(path, params, Path(cache_dir))
+
+
+def _load_or_train(path, params, cache_dir):
+    key = artifact_key(path, params)
+    if key in _loaded:
+        return _loaded[key]
+
+    artifact = cache_dir / f"{key}.joblib"
+    bundle = None
+    if artifact.exists():
+        try:
+            # المصفوفات تُقرأ عبر memory-map بدل نسخها إلى الذاكرة
+            bundle = joblib.load(artifact, mmap_mode="r")
+            # النسخة المسطّحة لا تُحفظ مع النموذج (تضاعف حجم الملف تقريبًا)، وإعادة بنائها أسرع من قراءتها
+            bundle["flat"] = engines.ENGINES[bundle["params"]["engine"]].flatten(bundle["model"])
+            os.utime(artifact)
+        except Exception:
+            artifact.unlink(missing_ok=True)
+
+    if bundle is None:
+        with span("train"):
+            bundle = train(ingest.load(path), params)
+        bundle["key"] = key
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = artifact.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        joblib.dump({k: v for k, v in bundle.items() if k != "flat"}, tmp)
+        os.replace(tmp, artifact)
+        evict(cache_dir, keep=artifact.name)
+
+    _loaded.clear()
+    _loaded[key] = bundle
+    return bundle
+
+
+def encode(bundle, frame):
+    # ✅ ترميز متجه للأعمدة الفئوية؛ القيم غير المعروفة تأخذ رمزًا جديدًا بعد آخر فئة
+    X = pd.DataFrame({col: frame[col] for col in FEATURES})
+    for col in CATEGORICAL:
+        classes = bundle["encoders"][col].classes_
+        codes = pd.Categorical(frame[col], categories=classes).codes.astype(np.int64)
+        codes[codes < 0] = len(classes)
+        X[col] = codes
+    return X
+
+
+def encode_row(bundle, values):
+    # ⚡ مسار سريع لحملة واحدة بدون pandas: قيم بنفس ترتيب FEATURES
+    row = [bundle["vocab"][col].get(val, len(bundle["vocab"][col])) if col in CATEGORICAL else val
+           for col, val in zip(FEATURES, values)]
+    return np.array([row], dtype=np.float64)
+
+
+def predict_proba(bundle, X):
+    if bundle.get("flat") is not None and len(X) <= FLAT_MAX_ROWS:
+        return bundle["flat"].predict_proba(X)
+    return bundle["model"].predict_proba(np.asarray(X))
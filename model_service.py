@@ -0,0 +1,86 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import model_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ModelService:
+    # 📌 نموذج واحد مشترك لكل عملية: التدريب في الخلفية بعامل واحد، وطلب تدريب واحد فقط لكل نسخة بيانات،
+    # والجلسات تستمر بالنموذج السابق حتى يجهز الجديد ثم يُستبدل دفعة واحدة
+    def __init__(self, path=model_cache.DATA_PATH, params=None, poll_interval=2.0):
+        self.path = path
+        self.params = params
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training")
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.current = None
+        # (المفتاح، الخطأ) لآخر تدريب فاشل؛ لا يُعاد نفس التدريب حتى تتغير البيانات أو المعاملات
+        self.failed = None
+        self.ready = threading.Event()
+        self.stopped = threading.Event()
+        self.watcher = None
+
+    @property
+    def training(self):
+        return bool(self.pending)
+
+    def refresh(self):
+        key = model_cache.artifact_key(self.path, self.params)
+        with self.lock:
+            if self.current is not None and self.current["key"] == key:
+                return None
+            if self.failed is not None and self.failed[0] == key:
+                return None
+            if key not in self.pending:
+                self.pending[key] = self.executor.submit(self._build, key)
+            return self.pending[key]
+
+    def _build(self, key):
+        try:
+            try:
+                bundle = model_cache.load_or_train(self.path, self.params)
+            except Exception as exc:
+                logger.exception("فشل تدريب النموذج (النسخة %s)؛ لن تُعاد المحاولة حتى يتغير ملف البيانات", key[:12])
+                with self.lock:
+                    self.failed = (key, exc)
+                raise
+            with self.lock:
+                self.current = bundle
+                self.failed = None
+            self.ready.set()
+            return bundle
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def get(self, timeout=None):
+        # أول نموذج فقط يُنتظر؛ بعد ذلك يُعاد النموذج الحالي فورًا ويتولى المراقب اكتشاف التغييرات
+        if self.current is None:
+            future = self.refresh()
+            if future is not None:
+                future.result(timeout=timeout)
+            elif self.current is None and self.failed is not None:
+                raise self.failed[1]
+        return self.current
+
+    def _watch(self):
+        while not self.stopped.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("فشل فحص ملف البيانات أو جدولة التدريب")
+
+    def start(self):
+        if self.watcher is None:
+            self.watcher = threading.Thread(target=self._watch, name="data-watcher", daemon=True)
+            self.watcher.start()
+            self.refresh()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.executor.shutdown(wait=False)
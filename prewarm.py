@@ -0,0 +1,52 @@
+import logging
+import os
+import threading
+
+from instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+# 🔥 التهيئة المسبقة مفعلة افتراضيًا؛ DECISION_PREWARM=0 لتعطيلها
+ENABLED = os.environ.get("DECISION_PREWARM", "1") != "0"
+
+
+def run(path=None, params=None):
+    # 📌 نفس ما يحتاجه أول ضغط على زر التحليل، لكن قبل أن يضغطه المستخدم: المكتبات، البيانات،
+    # النموذج (من القرص أو بالتدريب) والمخططات. كل النتائج تُحفظ في ذاكرات العملية المشتركة فيجدها التطبيق جاهزة
+    with span("prewarm"):
+        with span("prewarm.imports"):
+            import charts
+            import ingest
+            import model_cache
+
+        # النموذج أولًا لأنه الأبطأ وأول ما يحتاجه التنبؤ
+        path = path or model_cache.DATA_PATH
+        with span("prewarm.model"):
+            bundle = model_cache.load_or_train(path, params)
+        with span("prewarm.data"):
+            df = ingest.load(path)
+        with span("prewarm.fonts"):
+            charts.warm()
+        with span("prewarm.charts"):
+            version = model_cache.source_digest(path)
+            charts.importance_chart(bundle)
+            charts.budget_chart(df, version)
+            charts.channels_chart(df, version)
+
+
+def _run_logged(path, params):
+    try:
+        run(path, params)
+    except Exception:
+        logger.exception("فشلت التهيئة المسبقة؛ سيتم التحميل عند أول استخدام")
+
+
+def start(path=None, params=None):
+    thread = threading.Thread(target=_run_logged, args=(path, params), name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    # ملء مخازن القرص (البيانات والنموذج) قبل تشغيل الخادم، مثلًا أثناء بناء الحاوية
+    run()
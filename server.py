@@ -0,0 +1,197 @@
+import argparse
+import json
+import logging
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import batch
+import engines
+import instrumentation
+import model_cache
+from model_service import ModelService
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    def __init__(self, window=10_000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.batches = deque(maxlen=window)
+        self.requests = 0
+        self.started = time.perf_counter()
+
+    def record(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            self.requests += 1
+
+    def record_batch(self, size):
+        with self.lock:
+            self.batches.append(size)
+
+    def snapshot(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            batches = np.array(self.batches)
+            requests = self.requests
+        elapsed = time.perf_counter() - self.started
+        return {
+            "requests": requests,
+            "rps": requests / elapsed if elapsed else 0.0,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "mean_batch": float(batches.mean()) if len(batches) else None,
+        }
+
+
+class MicroBatcher:
+    # 📌 يجمع الطلبات المتزامنة في دفعة واحدة حتى يُستهلك كل مرور على الأشجار لعدة صفوف
+    def __init__(self, service, max_batch=256, max_wait=0.002, stats=None):
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats or LatencyStats()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, campaign):
+        future = Future()
+        self.queue.put((campaign, future))
+        return future
+
+    def _collect(self):
+        items = [self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(items) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                items.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            try:
+                # النموذج يُقرأ مرة لكل دفعة، فيُستخدم النموذج الجديد فور استبداله
+                bundle = self.service.get()
+                frame = pd.DataFrame([campaign for campaign, _ in items], columns=model_cache.FEATURES)
+                with instrumentation.span("server.batch"):
+                    scored = batch.score_chunk(bundle, frame)
+                version = bundle["key"][:12]
+                for (_, future), proba, label in zip(items, scored["احتمال_النجاح"], scored["التوقع"]):
+                    future.set_result({"احتمال_النجاح": float(proba), "التوقع": label, "النموذج": version})
+            except Exception as exc:
+                for _, future in items:
+                    future.set_exception(exc)
+            self.stats.record_batch(len(items))
+
+
+class ScoringServer(ThreadingHTTPServer):
+    request_queue_size = 1024
+
+
+def validate(campaign):
+    if not isinstance(campaign, dict):
+        raise ValueError("كل حملة يجب أن تكون كائن JSON")
+    missing = [col for col in model_cache.FEATURES if col not in campaign]
+    if missing:
+        raise ValueError(f"أعمدة ناقصة: {', '.join(missing)}")
+    numbers = {col: float(campaign[col]) for col in ("الميزانية", "المدة")}
+    # float يقبل "nan" و"inf" كنصوص؛ النموذج لا يعرف ماذا يفعل بها
+    invalid = [col for col, value in numbers.items() if not math.isfinite(value)]
+    if invalid:
+        raise ValueError(f"قيم غير صالحة: {', '.join(invalid)}")
+    return {**{col: str(campaign[col]) for col in model_cache.CATEGORICAL}, **numbers}
+
+
+def make_handler(batcher, timeout=5.0):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send(200, {**batcher.stats.snapshot(), "model": batcher.service.current["key"],
+                                 "engine": batcher.service.current["params"]["engine"],
+                                 "training": batcher.service.training,
+                                 "rss_bytes": instrumentation.rss_bytes(),
+                                 "stages": instrumentation.recorder.summary()})
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "not found"})
+                return
+            start = time.perf_counter()
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                campaigns = payload if isinstance(payload, list) else [payload]
+                futures = [batcher.submit(validate(c)) for c in campaigns]
+                results = [f.result(timeout=timeout) for f in futures]
+            except (ValueError, TypeError) as exc:
+                self._send(400, {"error": str(exc)})
+                return
+            except TimeoutError:
+                self._send(503, {"error": "انتهت مهلة التقييم"})
+                return
+            except Exception:
+                logger.exception("فشل تقييم الطلب")
+                self._send(500, {"error": "خطأ داخلي في الخادم"})
+                return
+            self._send(200, results if isinstance(payload, list) else results[0])
+            batcher.stats.record(time.perf_counter() - start)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="خادم تقييم الحملات التسويقية (HTTP/JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--data", default=model_cache.DATA_PATH, help="بيانات التدريب")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--engine", choices=list(engines.ENGINES), default=model_cache.DEFAULT_PARAMS["engine"],
+                        help="محرك التدريب")
+    args = parser.parse_args(argv)
+
+    # 📌 النموذج والمرمّزات تُحمَّل مرة واحدة عند بدء الخادم، ويُعاد التدريب في الخلفية عند تغير البيانات
+    service = ModelService(args.data, {"engine": args.engine}).start()
+    bundle = service.get()
+    batcher = MicroBatcher(service, args.max_batch, args.max_wait_ms / 1000)
+    httpd = ScoringServer((args.host, args.port), make_handler(batcher))
+    print(f"🚀 http://{args.host}:{args.port}/predict  (النموذج {bundle['key'][:12]})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(json.dumps(batcher.stats.snapshot(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
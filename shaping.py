@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+import pandas as pd
+import arabic_reshaper
+from bidi.algorithm import get_display
+
+
+# 📌 كل نص مميز يُعاد تشكيله مرة واحدة فقط ثم يُقرأ من الذاكرة
+@lru_cache(maxsize=4096)
+def shape(text):
+    return get_display(arabic_reshaper.reshape(text))
+
+
+def shape_series(series, labels=None):
+    # ✅ التشكيل يتم على الفئات وليس على الصفوف: عدد الاستدعاءات = عدد القيم المميزة
+    # labels (اختياري) يحوّل الرموز إلى نصوص قبل التشكيل، مثل {0: "نجاح", 1: "فشل"}
+    if labels is not None:
+        values = pd.Categorical(series, categories=list(labels))
+        return pd.Series(values.rename_categories([shape(labels[k]) for k in labels]),
+                         index=series.index, name=series.name)
+    values = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+    return values.cat.rename_categories(shape)
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import ingest
+
+DIMENSIONS = ["القناة", "الجمهور", "حالة_السوق"]
+TARGET = "النجاح"
+
+# عدد البايتات من أول الملف ومن قبل آخر موضع مقروء التي تُحسب منها بصمة الجزء المقروء
+FINGERPRINT_BYTES = 4096
+
+# حدود خانات مدرج الميزانية (لوغاريتمية)؛ خطأ الكميات التقريبي أقل من ~1.5٪ من القيمة
+BUDGET_BINS = np.geomspace(1_000, 1_000_000_000, 1025)
+
+
+def _fingerprint(f, offset):
+    # بصمة أول الملف وآخر ما قُرئ منه حتى offset
+    h = hashlib.sha256()
+    f.seek(0)
+    h.update(f.read(min(offset, FINGERPRINT_BYTES)))
+    start = max(offset - FINGERPRINT_BYTES, 0)
+    f.seek(start)
+    h.update(f.read(offset - start))
+    return h.hexdigest()
+
+
+def _complete_length(f, size):
+    # طول الملف حتى نهاية آخر سطر كامل
+    end = size
+    while end > 0:
+        start = max(end - 65536, 0)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+class StatsIndex:
+    # 📌 فهرس إحصائي صغير: أعداد ومجاميع لكل فئة ولكل قيمة نجاح، يُحدَّث بالصفوف الجديدة فقط
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.class_counts = {}
+        self.class_budget = {}
+        self.counts = {dim: {} for dim in DIMENSIONS}
+        self.budget_sums = {dim: {} for dim in DIMENSIONS}
+        self.budget_hist = np.zeros(len(BUDGET_BINS) + 1, dtype=np.int64)
+        self.budget_min = np.inf
+        self.budget_max = -np.inf
+        # موضع آخر سطر كامل مقروء من ملف المصدر وبصمته (للقراءة التزايدية)
+        self.source = None
+
+    @classmethod
+    def from_frame(cls, df):
+        index = cls()
+        index.update(df)
+        return index
+
+    def update(self, frame):
+        if len(frame) == 0:
+            return self
+        budget = frame["الميزانية"].to_numpy()
+        by_class = frame.groupby(TARGET, observed=True)["الميزانية"].agg(["size", "sum"])
+        per_dim = {
+            dim: (frame.groupby([dim, TARGET], observed=True).size(),
+                  frame.groupby(dim, observed=True)["الميزانية"].sum())
+            for dim in DIMENSIONS
+        }
+        hist = np.bincount(np.searchsorted(BUDGET_BINS, budget, side="right"), minlength=len(self.budget_hist))
+
+        # دمج النتائج في الفهرس: العمل هنا بعدد الفئات وليس بعدد الصفوف
+        with self.lock:
+            self.rows += len(frame)
+            for cls, (size, total) in by_class.iterrows():
+                self.class_counts[cls] = self.class_counts.get(cls, 0) + int(size)
+                self.class_budget[cls] = self.class_budget.get(cls, 0) + int(total)
+            for dim, (counts, sums) in per_dim.items():
+                for (category, cls), n in counts.items():
+                    entry = self.counts[dim].setdefault(category, {})
+                    entry[cls] = entry.get(cls, 0) + int(n)
+                for category, total in sums.items():
+                    self.budget_sums[dim][category] = self.budget_sums[dim].get(category, 0) + int(total)
+            self.budget_hist += hist
+            self.budget_min = min(self.budget_min, budget.min())
+            self.budget_max = max(self.budget_max, budget.max())
+        return self
+
+    def sync(self, path):
+        # ✅ إذا كان الملف قد كبر وبقيت بايتاته المقروءة سابقًا كما هي (بصمة أوله وآخر ما قُرئ منه)
+        # تُقرأ الصفوف المضافة وحدها؛ وأي تغيير آخر (تصغير، أو إعادة كتابة حتى لو كبر الحجم) يعيد البناء من البداية
+        with self.sync_lock:
+            return self._sync(Path(path))
+
+    def _sync(self, path):
+        stat = path.stat()
+        if self.source is not None and (stat.st_size, stat.st_mtime_ns) == self.source["stamp"]:
+            return self
+        with open(path, "rb") as f:
+            if (self.source is not None and stat.st_size >= self.source["offset"]
+                    and _fingerprint(f, self.source["offset"]) == self.source["fingerprint"]):
+                try:
+                    return self._append(f, path, stat)
+                except (ValueError, TypeError):
+                    # صفوف مضافة لا تطابق أعمدة الملف: إعادة البناء أسلم من فهرس نصف محدَّث
+                    pass
+            return self._rebuild(f, path, stat)
+
+    def _rebuild(self, f, path, stat):
+        # الصف الأخير غير المكتمل (الملف لا ينتهي بسطر جديد) يُترك حتى تكتمل كتابته: لا يمر عبر
+        # ingest.load لأن قراءة الملف كاملًا تفشل إذا انقطع الصف داخل حقل، فتُقرأ الأسطر الكاملة وحدها
+        offset = _complete_length(f, stat.st_size)
+        if offset == stat.st_size:
+            frame = ingest.load(path)
+        elif offset == 0:
+            frame = pd.DataFrame(columns=ingest.COLUMNS)
+        else:
+            f.seek(0)
+            frame = pd.read_csv(io.BytesIO(f.read(offset)),
+                                dtype={**ingest.NUMERIC, **{col: "category" for col in ingest.CATEGORICAL}})
+        with self.lock:
+            self.reset()
+        self.update(frame)
+        self._advance(f, offset, stat)
+        return self
+
+    def _append(self, f, path, stat):
+        offset = _complete_length(f, stat.st_size)
+        if offset > self.source["offset"]:
+            f.seek(self.source["offset"])
+            data = f.read(offset - self.source["offset"])
+            columns = pd.read_csv(path, nrows=0).columns
+            self.update(pd.read_csv(io.BytesIO(data), header=None, names=columns))
+        self._advance(f, max(offset, self.source["offset"]), stat)
+        return self
+
+    def _advance(self, f, offset, stat):
+        self.source = {"offset": offset, "fingerprint": _fingerprint(f, offset),
+                       "stamp": (stat.st_size, stat.st_mtime_ns)}
+
+    def mean_budget(self, cls):
+        return self.class_budget[cls] / self.class_counts[cls] if self.class_counts.get(cls) else float("nan")
+
+    def class_rates(self, dim, cls):
+        # نسبة الصفوف ذات قيمة النجاح cls داخل كل فئة، مرتبة حسب اسم الفئة
+        rates = {category: entry.get(cls, 0) / sum(entry.values()) for category, entry in self.counts[dim].items()}
+        return pd.Series(rates, dtype=float).sort_index()
+
+    def budget_quantiles(self, qs=(0.25, 0.5, 0.75)):
+        cumulative = np.cumsum(self.budget_hist)
+        edges = np.concatenate([[self.budget_min], BUDGET_BINS, [self.budget_max]])
+        result = []
+        for q in qs:
+            target = q * self.rows
+            i = int(np.searchsorted(cumulative, target))
+            before = cumulative[i - 1] if i else 0
+            lo = max(edges[i], self.budget_min)
+            hi = min(edges[i + 1], self.budget_max)
+            frac = (target - before) / self.budget_hist[i] if self.budget_hist[i] else 0.0
+            result.append(float(lo * (hi / lo) ** frac) if lo > 0 else float(lo + (hi - lo) * frac))
+        return result
@@ -0,0 +1,107 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import engines
+import model_cache
+
+logger = logging.getLogger(__name__)
+
+# خطوات المدة كما في حقل الإدخال: من 7 إلى 100 يومًا بخطوة 7
+DURATIONS = np.arange(7, 101, 7)
+MAX_ENTRIES = 4
+# عدد نقاط الشبكة التي تُقارن بـ predict_proba المباشر بعد ضغط المحاور
+SPOT_CHECKS = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def budget_axis(low=1_000, high=1_000_000, steps=1_000):
+    return np.unique(np.linspace(low, high, steps).round().astype(np.int64))
+
+
+def _predict_grid(model, axes):
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(axes))
+    return model.predict_proba(grid).reshape(tuple(len(a) for a in axes) + (-1,))
+
+
+def _compressed(bundle, axes):
+    # 📌 القيم العددية الواقعة بين نفس عتبتين متتاليتين لها نفس الاحتمال، فتُقيَّم قيمة واحدة لكل مجال
+    # ثم تُنسخ إلى بقية القيم
+    thresholds = engines.ENGINES[bundle["params"]["engine"]].thresholds(bundle["model"])
+    if thresholds is None:
+        return None
+    reduced, expand = [], []
+    for col, axis in zip(model_cache.FEATURES, axes):
+        if col in model_cache.CATEGORICAL:
+            reduced.append(axis)
+            expand.append(np.arange(len(axis)))
+            continue
+        _, first, inverse = np.unique(np.searchsorted(thresholds[model_cache.FEATURES.index(col)], axis),
+                                      return_index=True, return_inverse=True)
+        reduced.append(axis[first])
+        expand.append(inverse)
+    proba = _predict_grid(bundle["model"], reduced)[np.ix_(*expand)]
+
+    # ✅ العتبات تُقرأ من داخل sklearn؛ مقارنة نقاط عشوائية بالتنبؤ المباشر تكشف أي تغير في معناها
+    rng = np.random.default_rng(0)
+    points = tuple(rng.integers(0, len(axis), SPOT_CHECKS) for axis in axes)
+    rows = np.column_stack([axis[i] for axis, i in zip(axes, points)])
+    if not np.allclose(proba[points], bundle["model"].predict_proba(rows), rtol=0, atol=1e-9):
+        raise ValueError("compressed grid differs from predict_proba")
+    return proba
+
+
+def _score(bundle, budgets, durations):
+    # ترتيب المحاور = ترتيب FEATURES: الميزانية، القناة، الجمهور، المدة، حالة السوق
+    codes = {col: np.arange(len(bundle["vocab"][col])) for col in model_cache.CATEGORICAL}
+    axes = [budgets, codes["القناة"], codes["الجمهور"], durations, codes["حالة_السوق"]]
+    if bundle.get("flat") is not None:
+        proba = bundle["flat"].predict_grid(axes)
+    else:
+        # نماذج بدون غابة مسطّحة: محاور مضغوطة بعتبات النموذج، أو الشبكة كاملة في استدعاء predict_proba واحد
+        # إذا لم يوفر المحرك عتباته أو تغيرت بنية sklearn الداخلية التي تُقرأ منها
+        try:
+            proba = _compressed(bundle, axes)
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+            logger.warning("تعذر ضغط محاور المسح بعتبات النموذج؛ تُقيَّم الشبكة كاملة", exc_info=True)
+            proba = None
+        if proba is None:
+            proba = _predict_grid(bundle["model"], axes)
+    success = list(bundle["model"].classes_).index(1)
+    # المحاور الناتجة: القناة × الجمهور × حالة السوق × المدة × الميزانية
+    return np.ascontiguousarray(proba[..., success].transpose(1, 2, 4, 3, 0))
+
+
+def sweep(bundle, budgets, durations=DURATIONS):
+    budgets = np.asarray(budgets)
+    durations = np.asarray(durations)
+    key = (bundle["key"], budgets.tobytes(), durations.tobytes())
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    result = {
+        "القناة": list(bundle["vocab"]["القناة"]),
+        "الجمهور": list(bundle["vocab"]["الجمهور"]),
+        "حالة_السوق": list(bundle["vocab"]["حالة_السوق"]),
+        "المدة": durations,
+        "الميزانية": budgets,
+        "proba": _score(bundle, budgets, durations),
+    }
+    with _lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return result
+
+
+def min_budget(result, target):
+    # ✅ أقل ميزانية في الشبكة تصل عندها احتمالية النجاح إلى الهدف (NaN إذا لم تصل أبدًا)
+    reached = result["proba"] >= target
+    first = reached.argmax(axis=-1)
+    return np.where(reached.any(axis=-1), result["الميزانية"][first], np.nan)